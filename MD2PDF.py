@@ -9,72 +9,615 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QMessageBox, QCheckBox, QListWidget, QListWidgetItem,
                              QSplitter, QFrame, QScrollArea, QSpinBox, QComboBox,
                              QDialog, QDialogButtonBox, QInputDialog)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl, QTimer, QMarginsF
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineSettings
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl, QTimer, QMarginsF, QStandardPaths, QByteArray
 from PyQt5.QtGui import QPageLayout, QPageSize, QDragEnterEvent, QDropEvent, QFont, QIcon, QPalette, QColor
-import markdown
-from markdown.extensions import fenced_code, tables, toc, nl2br, sane_lists
 import tempfile
 import json
+import hashlib
+import threading
+import time
+import mmap
+import gzip
+import mimetypes
+from html import escape, unescape
+from urllib.parse import unquote
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 
+# mistuneがインストールされていれば、変換オプションで高速なMarkdown変換を選択できる（任意）
+try:
+    import mistune
+    from mistune.toc import normalize_toc_item, render_toc_ul
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:
+    mistune = None
 
 
+# 変換済みHTMLをキャッシュする最大件数
+HTML_CACHE_SIZE = 32
+
+# ディスクキャッシュの形式バージョン（変換処理を変更したら上げる）
+DISK_CACHE_VERSION = 6
+
+# ディスクキャッシュの合計サイズの上限（バイト、超えた分は使われていないものから削除）
+DISK_CACHE_MAX_BYTES = 50_000_000
+
+# ディスクキャッシュの保持期間（秒、これより長く使われていないものは削除）
+DISK_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# これより大きいファイルはメモリマップで読み込む（バイト）
+MMAP_THRESHOLD = 2_000_000
+
+# ファイル選択から読み込み開始までの待ち時間（ミリ秒）
+SELECT_DEBOUNCE_MS = 120
+
+# 一括変換でHTMLを別プロセスで先行変換する最小ファイル数
+PREFETCH_MIN_FILES = 2
+
+# 先行変換に使うプロセス数の上限（プールは起動中に1つだけ作り、一括変換のたびに使い回す）
+PREFETCH_MAX_WORKERS = 4
+
+# 一括変換で同時にPDFを生成するWebEngineページの数
+PDF_PAGE_POOL_SIZE = 3
+
+# PDF生成前に文書の読み込み完了を確認する間隔（ミリ秒）
+READY_POLL_MS = 50
+
+# これより大きいHTMLは一時ファイルに書き出してプレビューする（UTF-8のバイト数）
+LARGE_HTML_THRESHOLD = 256_000
+
+# python-markdownの拡張機能（目次・コードハイライトの有無ごとに事前に用意）
+_EXT_WITH_TOC = (
+    'fenced_code',
+    'tables',
+    'toc',
+    'nl2br',
+    'sane_lists',
+    'codehilite',
+    'attr_list',
+    'def_list',
+    'footnotes',
+    'md_in_html',
+    'meta',
+)
+_EXT_WITHOUT_TOC = tuple(ext for ext in _EXT_WITH_TOC if ext != 'toc')
+_MARKDOWN_EXTENSIONS = {
+    (True, True): _EXT_WITH_TOC,
+    (False, True): _EXT_WITHOUT_TOC,
+    (True, False): tuple(ext for ext in _EXT_WITH_TOC if ext != 'codehilite'),
+    (False, False): tuple(ext for ext in _EXT_WITHOUT_TOC if ext != 'codehilite'),
+}
+
+# コードブロックの開始行（Mermaidのブロックは変換中に表示用のブロックとして出力する）
+_FENCE_OPEN_RE = re.compile(r'^(?P<fence>`{3,}|~{3,})[ ]*(?P<lang>[^`\s]*)')
+_MERMAID_BLOCK = ('<div class="mermaid"><pre style="text-align: left; background: #f8f9fa; '
+                  'padding: 10px; border-radius: 4px;"><code>{}</code></pre></div>')
+
+# 一括変換でdata URIに埋め込むローカル画像の上限サイズ（バイト、これより大きい画像はパスのまま読み込む）
+INLINE_IMAGE_MAX_BYTES = 64_000
+
+# 1文書でdata URIに埋め込む画像の合計上限（文字数、一時ファイル経由の読み込みにならないよう閾値より小さくする）
+INLINE_IMAGES_MAX_TOTAL = LARGE_HTML_THRESHOLD // 2
+
+# data URIに変換した画像のキャッシュ上限（文字数の合計）
+IMAGE_CACHE_MAX_BYTES = 256_000_000
+
+# 画像参照とURLスキームの判定
+_IMG_SRC_RE = re.compile(r'(<img\b[^>]*?\bsrc=")([^"]+)(")', re.I)
+_URL_SCHEME_RE = re.compile(r'([a-zA-Z][a-zA-Z0-9+.-]*):')
+
+# 改ページマーカーの置換先（前後の行と同じブロックにならないよう空行で区切る）
+_PAGE_BREAK_HTML = '\n\n<div class="page-break" style="page-break-after: always;"></div>\n\n'
+
+# プレビュー・PDF共通のHTMLテンプレート（本文の前後に連結する）
+_HTML_HEAD = '''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="color-scheme" content="light">
+    <meta name="print-color-adjust" content="exact">
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', 'Hiragino Sans', Arial, 'Meiryo', sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 900px;
+            margin: 20px auto;
+            padding: 20px;
+            background: white;
+            box-shadow: 0 0 10px rgba(0,0,0,0.1);
+            border-radius: 4px;
+        }
+        h1, h2, h3, h4, h5, h6 {
+            margin-top: 24px;
+            margin-bottom: 16px;
+            font-weight: 600;
+            line-height: 1.25;
+        }
+        h1 { font-size: 2em; border-bottom: 1px solid #eaecef; padding-bottom: .3em; }
+        h2 { font-size: 1.5em; border-bottom: 1px solid #eaecef; padding-bottom: .3em; }
+        h3 { font-size: 1.25em; }
+        code {
+            background-color: rgba(27,31,35,.05);
+            border-radius: 3px;
+            font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
+            font-size: 85%;
+            margin: 0;
+            padding: .2em .4em;
+        }
+        pre {
+            background-color: #f6f8fa;
+            border-radius: 3px;
+            font-size: 85%;
+            line-height: 1.45;
+            overflow: auto;
+            padding: 16px;
+        }
+        pre code {
+            background-color: transparent;
+            border: 0;
+            display: inline;
+            line-height: inherit;
+            margin: 0;
+            overflow: visible;
+            padding: 0;
+            word-wrap: normal;
+        }
+        table {
+            border-collapse: collapse;
+            margin: 16px 0;
+            width: 100%;
+            display: table;
+        }
+        table th, table td {
+            border: 1px solid #dfe2e5;
+            padding: 6px 13px;
+        }
+        table th {
+            background-color: #f6f8fa;
+            font-weight: 600;
+        }
+        blockquote {
+            border-left: 4px solid #dfe2e5;
+            color: #6a737d;
+            padding-left: 16px;
+            margin: 16px 0;
+        }
+        img {
+            max-width: 100%;
+            height: auto;
+        }
+        .mermaid {
+            text-align: center;
+            margin: 16px 0;
+            padding: 16px;
+            background-color: #f8f9fa;
+            border: 1px solid #e9ecef;
+            border-radius: 4px;
+        }
+        /* 印刷用スタイル（背景色の印刷指定はbodyから全要素に継承される） */
+        @media print {
+            body {
+                margin: 0;
+                padding: 10mm;
+                font-size: 10pt;
+                color: #333 !important;
+                -webkit-print-color-adjust: exact !important;
+                print-color-adjust: exact !important;
+            }
+            .page-break {
+                page-break-after: always;
+                break-after: page;
+            }
+            h1, h2, h3 {
+                page-break-after: avoid;
+                color: #333 !important;
+            }
+            pre, table, blockquote {
+                page-break-inside: avoid;
+            }
+            code {
+                background-color: rgba(27,31,35,.05) !important;
+            }
+            pre {
+                background-color: #f6f8fa !important;
+            }
+            table th {
+                background-color: #f6f8fa !important;
+            }
+            blockquote {
+                border-left: 4px solid #dfe2e5 !important;
+                color: #6a737d !important;
+            }
+            .mermaid {
+                background-color: #f8f9fa !important;
+                border: 1px solid #e9ecef !important;
+            }
+        }
+    </style>
+</head>
+<body>
+    '''
+
+# プレビュー用のコードハイライト（resourcesに同梱したhighlight.jsをブラウザ側で読み込む）
+_RESOURCES_URL = QUrl.fromLocalFile(str(Path(__file__).parent / "resources")).toString()
+_PREVIEW_HIGHLIGHT = f'''
+    <link rel="stylesheet" href="{_RESOURCES_URL}/highlight.css">
+    <style>
+        pre code.hljs {{ padding: 0; background: transparent; }}
+    </style>
+    <script src="{_RESOURCES_URL}/highlight.min.js"></script>
+    <script>
+        if (typeof hljs !== 'undefined') {{
+            // 言語指定のあるコードブロックのみ対象（Mermaidは変換時に置き換え済み）
+            document.querySelectorAll('pre code[class*="language-"]').forEach(function (block) {{
+                hljs.highlightElement(block);
+            }});
+        }}
+    </script>'''
+
+_HTML_TAIL = '''
+</body>
+</html>
+'''
+
+# プレビュー用の末尾（ハイライト用スクリプトを連結済み）
+_PREVIEW_TAIL = _PREVIEW_HIGHLIGHT + _HTML_TAIL
+
+# WebEngineにはUTF-8のバイト列で渡すため、テンプレートも事前にエンコードしておく
+_HTML_HEAD_BYTES = _HTML_HEAD.encode('utf-8')
+_HTML_TAIL_BYTES = _HTML_TAIL.encode('utf-8')
+_PREVIEW_TAIL_BYTES = _PREVIEW_TAIL.encode('utf-8')
+
+
+def read_markdown_file(file_path):
+    """Markdownファイルを一括で読み込んで文字列を返す"""
+    return read_markdown_file_with_encoding(file_path)[0]
+
+
+def read_markdown_file_with_encoding(file_path):
+    """Markdownファイルを一括で読み込んで（文字列, 判定した文字コード）を返す"""
+    path = Path(file_path)
+    if path.stat().st_size > MMAP_THRESHOLD:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[:]
+    else:
+        data = path.read_bytes()
+    
+    encoding = 'utf-8'
+    try:
+        text = data.decode(encoding)
+    except UnicodeDecodeError:
+        # UTF-8で読めない場合はShift_JISとして再試行（保存時も同じ文字コードを使う）
+        encoding = 'cp932'
+        text = data.decode(encoding)
+    
+    # テキストモードでの読み込みと同様に改行コードを統一
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text, encoding
+
+
+def stat_mtime(file_path):
+    """ファイルの更新日時を1回のstatで取得（存在しなければNone）"""
+    try:
+        return os.stat(file_path).st_mtime
+    except OSError:
+        return None
+
+
+def path_key(file_path):
+    """重複判定用にファイルパスを正規化"""
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def disk_cache_name(content_bytes, include_toc, page_break_marker, for_pdf, use_mistune):
+    """内容と変換オプションからディスクキャッシュのファイル名を生成"""
+    renderer = 'mistune' if use_mistune and mistune is not None else 'markdown'
+    options = (f"{DISK_CACHE_VERSION}\0{renderer}\0{int(include_toc)}\0{page_break_marker}\0"
+               f"{int(for_pdf)}\0").encode('utf-8')
+    return hashlib.sha256(options + content_bytes).hexdigest() + ".html.gz"
+
+
+def load_cached_html(cache_path):
+    """ディスクキャッシュから本文HTMLを読み込む（なければNone）"""
+    try:
+        with gzip.open(cache_path, 'rb') as f:
+            body_html = f.read().decode('utf-8')
+        # 更新日時を最終使用日時として扱い、よく使うものを削除の対象から外す
+        os.utime(cache_path)
+        return body_html
+    except (OSError, EOFError, UnicodeDecodeError):
+        return None
+
+
+def store_cached_html(cache_path, body_html):
+    """本文HTMLをディスクキャッシュに保存（失敗しても変換は継続）"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中のファイルを読まないよう一時ファイル経由で置き換える
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(temp_path, 'wb', compresslevel=1) as f:
+            f.write(body_html.encode('utf-8'))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"HTMLキャッシュの保存に失敗: {cache_path} - {e}")
+
+
+def prune_disk_cache(cache_dir):
+    """ディスクキャッシュから期限切れのファイルと、合計サイズの上限を超えた分を古い順に削除"""
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+    
+    # 新しい順に残していき、期限切れか上限を超えたものを削除
+    entries.sort(reverse=True)
+    expire_time = time.time() - DISK_CACHE_MAX_AGE
+    total_size = 0
+    for mtime, size, path in entries:
+        total_size += size
+        if mtime < expire_time or total_size > DISK_CACHE_MAX_BYTES:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                print(f"HTMLキャッシュの削除に失敗: {path} - {e}")
+
+
+def heading_slug(token, index):
+    """見出しのアンカーIDを生成（python-markdownのtoc拡張に近い形式）"""
+    slug = re.sub(r'[^\w\s-]', '', token['text']).strip().lower()
+    slug = re.sub(r'[-\s]+', '-', slug)
+    return slug or f"toc_{index + 1}"
+
+
+def mermaid_block_html(code):
+    """Mermaidのコードを表示用のブロック（div.mermaid）にする"""
+    return _MERMAID_BLOCK.format(escape(code, quote=False))
+
+
+class MermaidPreprocessor:
+    """Mermaidのコードブロックを表示用のブロックに置き換えるpython-markdownのプリプロセッサ"""
+    def __init__(self, md):
+        self.md = md
+        
+    def run(self, lines):
+        if not any('mermaid' in line for line in lines):
+            return lines
+        
+        new_lines = []
+        i = 0
+        while i < len(lines):
+            match = _FENCE_OPEN_RE.match(lines[i])
+            if match is None:
+                new_lines.append(lines[i])
+                i += 1
+                continue
+            
+            # 閉じの行を探す（他のコードブロック内の```mermaidは例として扱い、そのまま残す）
+            fence = match.group('fence')
+            end = i + 1
+            while end < len(lines) and lines[end].rstrip(' ') != fence:
+                end += 1
+            if end == len(lines) or match.group('lang') != 'mermaid':
+                new_lines.extend(lines[i:end + 1])
+            else:
+                # fenced_codeと同様に生のHTMLとして退避し、前後の段落とは別のブロックにする
+                placeholder = self.md.htmlStash.store(mermaid_block_html('\n'.join(lines[i + 1:end]) + '\n'))
+                new_lines.extend(('', placeholder, ''))
+            i = end + 1
+        return new_lines
+
+
+if mistune is not None:
+    class MermaidRenderer(mistune.HTMLRenderer):
+        """Mermaidのコードブロックを表示用のブロックとして出力するレンダラー"""
+        def block_code(self, code, info=None):
+            if info and info.strip().split(None, 1)[0] == 'mermaid':
+                return mermaid_block_html(code) + '\n'
+            return super().block_code(code, info)
+            
+            
+    class HighlightRenderer(MermaidRenderer):
+        """コードブロックをPygmentsでハイライトするレンダラー（codehilite相当）"""
+        def __init__(self):
+            super().__init__(escape=False)
+            self.formatter = HtmlFormatter(cssclass='codehilite', wrapcode=True)
+            
+        def block_code(self, code, info=None):
+            lang = info.strip().split(None, 1)[0] if info else ''
+            if lang and lang != 'mermaid':
+                try:
+                    lexer = get_lexer_by_name(lang)
+                except ClassNotFound:
+                    lexer = None
+                if lexer is not None:
+                    return highlight(code, lexer, self.formatter)
+            return super().block_code(code, info)
+
+
+class MistuneConverter:
+    """mistuneによるMarkdown変換（python-markdownと同じreset/convertで呼び出せる、meta/attr_list/md_in_htmlは非対応）"""
+    def __init__(self, include_toc, highlight_code=True):
+        self.include_toc = include_toc
+        # fenced_code/tables/nl2br/def_list/footnotes/codehilite に相当する設定
+        renderer = HighlightRenderer() if highlight_code else MermaidRenderer(escape=False)
+        self.md = mistune.create_markdown(
+            hard_wrap=True,
+            renderer=renderer,
+            plugins=['table', 'footnotes', 'def_list', 'task_lists', 'url'],
+        )
+        if include_toc:
+            self.md.before_render_hooks.append(self.toc_hook)
+            
+    def toc_hook(self, md, state):
+        """見出しにIDを付与し、[TOC]マーカーがある場合のみ目次項目を収集"""
+        # 目次の文字列化は見出しごとにインライン変換が走るため、必要な時だけ行う
+        collect_items = '[TOC]' in state.src
+        toc_items = []
+        used_ids = set()
+        index = 0
+        for token in state.tokens:
+            if token['type'] == 'heading':
+                # 同じ見出しが複数ある場合はtoc拡張と同様に _1, _2 ... を付けて区別する
+                slug = heading_id = heading_slug(token, index)
+                suffix = 1
+                while heading_id in used_ids:
+                    heading_id = f"{slug}_{suffix}"
+                    suffix += 1
+                used_ids.add(heading_id)
+                token['attrs']['id'] = heading_id
+                if collect_items:
+                    toc_items.append(normalize_toc_item(md, token, parent=state))
+                index += 1
+        state.env['toc_items'] = toc_items
+            
+    def reset(self):
+        """状態は変換ごとに生成されるため何もしない"""
+        
+    def convert(self, text):
+        html, state = self.md.parse(text)
+        # [TOC] マーカーを目次に置き換える
+        if self.include_toc and '<p>[TOC]</p>' in html:
+            toc_html = '<div class="toc">\n' + render_toc_ul(state.env['toc_items']) + '</div>\n'
+            html = html.replace('<p>[TOC]</p>', toc_html)
+        return html
+
+
+def create_python_markdown(include_toc, highlight_code=True):
+    """python-markdownのインスタンスを生成（標準の変換処理）"""
+    import markdown
+    
+    extensions = _MARKDOWN_EXTENSIONS[(bool(include_toc), bool(highlight_code))]
+    md = markdown.Markdown(extensions=extensions)
+    # Mermaidのブロックはfenced_code（優先度25）より先に処理する
+    md.preprocessors.register(MermaidPreprocessor(md), 'mermaid', 26)
+    return md
+
+
+def create_markdown_converter(include_toc, highlight_code=True, use_mistune=False):
+    """Markdown変換インスタンスを生成（mistuneは指定され、かつインストールされている場合のみ使用）"""
+    if use_mistune and mistune is not None:
+        return MistuneConverter(include_toc, highlight_code)
+    return create_python_markdown(include_toc, highlight_code)
+
+
+def build_html_document(body_html, for_pdf):
+    """本文HTMLをテンプレートで包んでHTML文書（UTF-8のバイト列）にする"""
+    # プレビューではコードのハイライトをブラウザ側で行う
+    tail = _HTML_TAIL_BYTES if for_pdf else _PREVIEW_TAIL_BYTES
+    return b''.join((_HTML_HEAD_BYTES, body_html.encode('utf-8'), tail))
+
+
+def convert_markdown_body(md, markdown_content, page_break_marker):
+    """Markdownを本文HTMLに変換"""
+    # 改ページマーカーを処理（マーカーを含まない文書はコピーを作らない）
+    if page_break_marker in markdown_content:
+        markdown_content = markdown_content.replace(page_break_marker, _PAGE_BREAK_HTML)
+    md.reset()
+    return md.convert(markdown_content)
+
+
+# プロセスプール内で使い回すMarkdownインスタンス（目次設定・mistune使用の有無ごと）
+_process_converters = {}
+
+
+def _convert_one(file_path, include_toc, page_break_marker, disk_cache_dir, use_mistune):
+    """ファイルを読み込んでPDF用の本文HTMLに変換（一括変換のプロセスプールで実行）"""
+    content = read_markdown_file(file_path)
+    
+    cache_path = None
+    if disk_cache_dir is not None:
+        cache_path = disk_cache_dir / disk_cache_name(content.encode('utf-8'), include_toc, page_break_marker,
+                                                      True, use_mistune)
+        body_html = load_cached_html(cache_path)
+        if body_html is not None:
+            return file_path, body_html
+    
+    md = _process_converters.get((include_toc, use_mistune))
+    if md is None:
+        md = _process_converters[(include_toc, use_mistune)] = create_markdown_converter(include_toc,
+                                                                                         use_mistune=use_mistune)
+    body_html = convert_markdown_body(md, content, page_break_marker)
+    
+    if cache_path is not None:
+        store_cached_html(cache_path, body_html)
+    return file_path, body_html
+
+
+# QtWebEngineWidgetsモジュール（読み込みが重いため初回使用時にインポートする）
+_WEBENGINE = None
+
+
+def load_webengine():
+    """QtWebEngineWidgetsを初回のみインポートして返す（QApplication生成後に呼び出す）"""
+    global _WEBENGINE
+    if _WEBENGINE is None:
+        from PyQt5 import QtWebEngineWidgets
+        _WEBENGINE = QtWebEngineWidgets
+    return _WEBENGINE
+
+
+class ConversionError(Exception):
+    """一括変換で1ファイル分の処理に失敗した"""
 
 
 class FileItem(QFrame):
     """ファイルリストの個別アイテム"""
     def __init__(self, file_path, parent=None):
         super().__init__(parent)
-        self.file_path = file_path
         self.selected = False
+        self.list_index = 0  # ファイルリスト内での位置
         self.parent_converter = parent
         self.setup_ui()
+        self.set_file_path(file_path)
         
     def setup_ui(self):
+        self.setObjectName("fileItem")
+        self.setProperty("selected", False)
         self.setFixedHeight(30)
         self.setFrameStyle(QFrame.StyledPanel)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border: 1px solid #e0e0e0;
-                border-radius: 4px;
-                margin: 1px;
-            }
-            QFrame:hover {
-                background-color: #f0f8ff;
-                border-color: #3498db;
-            }
-        """)
         
         layout = QHBoxLayout(self)
         layout.setContentsMargins(8, 4, 8, 4)
         layout.setSpacing(8)
         
         # ファイル名ラベル
-        self.file_label = QLabel(Path(self.file_path).name)
-        self.file_label.setToolTip(self.file_path)
-        self.file_label.setStyleSheet("QLabel { color: #2c3e50; font-size: 12px; border: none; }")
+        self.file_label = QLabel()
         layout.addWidget(self.file_label, 1)
         
         # 削除ボタン
         self.delete_btn = QPushButton("×")
+        self.delete_btn.setObjectName("deleteButton")
         self.delete_btn.setFixedSize(20, 20)
-        self.delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                border-radius: 10px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #c0392b;
-            }
-        """)
         self.delete_btn.clicked.connect(self.delete_file)
         layout.addWidget(self.delete_btn, 0)
         
+    def set_file_path(self, file_path):
+        """ファイルパスと、そこから導出する表示名・ベースURLを設定"""
+        self.file_path = file_path
+        self.display_name = Path(file_path).stem
+        # プレビューのベースURL（ローカル画像の読み込み用）は選択のたびに作らず保持する
+        self.parent_url = QUrl.fromLocalFile(os.path.dirname(os.path.abspath(file_path)) + os.sep)
+        self.file_label.setText(os.path.basename(file_path))
+        self.file_label.setToolTip(file_path)
+        
+    def rebind(self, file_path):
+        """再利用時に別のファイルを割り当てる"""
+        self.set_file_path(file_path)
+        self.set_selected(False)
+        
     def delete_file(self):
         if self.parent_converter:
             self.parent_converter.remove_single_file(self.file_path)
@@ -85,45 +628,92 @@ class FileItem(QFrame):
         super().mousePressEvent(event)
         
     def set_selected(self, selected):
+        if self.selected == selected:
+            return
         self.selected = selected
-        if selected:
-            self.setStyleSheet("""
-                QFrame {
-                    background-color: #3498db;
-                    border: 1px solid #2980b9;
-                    border-radius: 4px;
-                    margin: 1px;
-                }
-            """)
-            self.file_label.setStyleSheet("QLabel { color: white; font-size: 12px; border: none; }")
-        else:
-            self.setStyleSheet("""
-                QFrame {
-                    background-color: white;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 4px;
-                    margin: 1px;
-                }
-                QFrame:hover {
-                    background-color: #f0f8ff;
-                    border-color: #3498db;
-                }
-            """)
-            self.file_label.setStyleSheet("QLabel { color: #2c3e50; font-size: 12px; border: none; }")
+        self.setProperty("selected", selected)
+        
+        # スタイルシートは再解析せず、プロパティに応じて再適用のみ行う
+        for widget in (self, self.file_label):
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+
+
+class MarkdownWorker(QThread):
+    """Markdownファイルの読み込みとHTML変換をバックグラウンドで実行"""
+    loaded = pyqtSignal(str, str, object, str, str)  # ファイルパス, 内容, HTML（バイト列）, エラー, 文字コード
+    
+    def __init__(self, converter, file_path, include_toc, page_break_marker, use_mistune):
+        super().__init__()
+        self.converter = converter
+        self.file_path = file_path
+        self.include_toc = include_toc
+        self.page_break_marker = page_break_marker
+        self.use_mistune = use_mistune
+        
+    def run(self):
+        try:
+            content, encoding = read_markdown_file_with_encoding(self.file_path)
+            
+            # 中断要求があれば変換せずに終了
+            if self.isInterruptionRequested():
+                return
+            
+            html_content = self.converter.render_html(content, self.include_toc, self.page_break_marker,
+                                                      use_disk_cache=True, use_mistune=self.use_mistune)
+            self.loaded.emit(self.file_path, content, html_content, "", encoding)
+        except Exception as e:
+            self.loaded.emit(self.file_path, "", b"", str(e), "")
 
 
 class MarkdownToPdfConverter(QMainWindow):
+    prefetch_done = pyqtSignal()  # 先行変換の1ファイル分が完了（プロセスプールのスレッドから通知）
+    
     def __init__(self):
         super().__init__()
         self.current_files = []  # 複数ファイル対応
         self.current_file_index = 0
         self.page_break_marker = "<!-- pagebreak -->"
+        self._html_cache = OrderedDict()  # 変換済み本文HTMLのLRUキャッシュ
+        self._md_instances = {}  # (目次の有無, PDF用か, mistuneを使うか)ごとのMarkdownインスタンス（遅延生成）
+        self._md_lock = threading.Lock()  # Markdown変換をスレッド間で排他
+        self._load_workers = []  # 実行中の読み込みワーカー
+        self._image_cache = OrderedDict()  # (画像のSHA-1, MIMEタイプ)ごとのdata URI（LRU）
+        self._image_cache_size = 0
+        self._image_digests = {}  # (パス, 更新日時, サイズ)ごとの画像のSHA-1
+        
+        # 変換済みHTMLのディスクキャッシュ（保存先が取得できなければ無効）
+        cache_location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        self._disk_cache_dir = Path(cache_location) / "md2pdf_html" if cache_location else None
+        if self._disk_cache_dir is not None:
+            # 起動を遅らせないよう、古いキャッシュの削除はバックグラウンドで行う
+            threading.Thread(target=prune_disk_cache, args=(self._disk_cache_dir,), daemon=True).start()
+        
+        # 一括変換時のHTML先行変換（完了の通知はGUIスレッドで受け取って次のファイルを割り当てる）
+        self._prefetch_executor = None
+        self._prefetch_futures = {}
+        self.prefetch_done.connect(self.convert_next_file)
+        
+        # 一括変換用のWebEngineページ（遅延生成）と、各ページで変換中のファイル情報
+        self._pdf_pages = []
+        self._pdf_jobs = {}
+        self._dispatching = False
+        self.is_converting = False
+        self._progress_pending = False  # 進捗表示の更新を予約済みか
+        self._progress_status = None  # 次の進捗表示の更新で表示するステータス
+        
+        # ファイル選択の読み込みを間引くタイマー
+        self._pending_path = None
+        self._load_timer = QTimer(self)
+        self._load_timer.setSingleShot(True)
+        self._load_timer.timeout.connect(self._do_load_pending)
         self.init_ui()
-        self.setup_webengine()
         self.apply_professional_styling()
         
     def setup_webengine(self):
         """WebEngineの設定を最適化"""
+        QWebEngineSettings = load_webengine().QWebEngineSettings
+        
         settings = QWebEngineSettings.defaultSettings()
         settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
         settings.setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
@@ -269,19 +859,7 @@ class MarkdownToPdfConverter(QMainWindow):
         self.drop_area.setObjectName("dropArea")
         self.drop_area.setAlignment(Qt.AlignCenter)
         self.drop_area.setMinimumHeight(80)
-        self.drop_area.setStyleSheet("""
-            QLabel#dropArea {
-                border: 2px dashed #cccccc;
-                border-radius: 8px;
-                background-color: #f8f9fa;
-                color: #6c757d;
-                font-size: 14px;
-            }
-            QLabel#dropArea:hover {
-                border-color: #007bff;
-                background-color: #e3f2fd;
-            }
-        """)
+        self.drop_area.setProperty("dragOver", False)
         layout.addWidget(self.drop_area)
         
         # ファイルリスト（スクロールエリア）
@@ -305,9 +883,13 @@ class MarkdownToPdfConverter(QMainWindow):
         
         # ファイルアイテムのリスト
         self.file_items = []
+        self._item_pool = []  # 再利用待ちのファイルアイテム
+        self._path_to_item = {}  # 正規化したファイルパス→ファイルアイテム
+        self._current_selected = None  # 選択中のファイルアイテム
         
         # 一時ファイルの管理
         self.temp_files = []  # 貼り付けで作成した一時ファイルを管理
+        self._html_temp_file = None  # 大きなHTMLの表示用に書き出した一時ファイル
         
         input_group.setLayout(layout)
         return input_group
@@ -335,6 +917,7 @@ class MarkdownToPdfConverter(QMainWindow):
         pagebreak_layout.addWidget(QLabel("改ページマーカー:"))
         self.pagebreak_input = QLineEdit(self.page_break_marker)
         self.pagebreak_input.setMaximumWidth(200)
+        self.pagebreak_input.editingFinished.connect(self.on_pagebreak_marker_edited)
         pagebreak_layout.addWidget(self.pagebreak_input)
         pagebreak_layout.addStretch()
         layout.addLayout(pagebreak_layout)
@@ -351,13 +934,28 @@ class MarkdownToPdfConverter(QMainWindow):
         # 目次オプション
         self.include_toc = QCheckBox("目次を含める")
         self.include_toc.setChecked(True)
+        self.include_toc.toggled.connect(self.refresh_preview)
         layout.addWidget(self.include_toc)
         
+        # mistuneによる高速変換オプション（インストールされている場合のみ選択可能）
+        self.use_mistune = QCheckBox("高速なMarkdown処理を使用する（mistune）")
+        self.use_mistune.setChecked(False)
+        self.use_mistune.setEnabled(mistune is not None)
+        self.use_mistune.setToolTip("meta・attr_list・md_in_htmlの記法には対応していません" if mistune is not None
+                                    else "mistuneがインストールされていません")
+        self.use_mistune.toggled.connect(self.refresh_preview)
+        layout.addWidget(self.use_mistune)
+        
         # 上書き確認オプション
         self.confirm_overwrite = QCheckBox("上書き時に確認する")
         self.confirm_overwrite.setChecked(True)
         layout.addWidget(self.confirm_overwrite)
         
+        # 更新されていないファイルのスキップオプション
+        self.skip_uptodate = QCheckBox("PDFが最新のファイルはスキップする")
+        self.skip_uptodate.setChecked(False)
+        layout.addWidget(self.skip_uptodate)
+        
         options_group.setLayout(layout)
         return options_group
         
@@ -414,27 +1012,13 @@ class MarkdownToPdfConverter(QMainWindow):
         # 貼り付け時もプレーンテキストとして処理
         self.markdown_editor.insertFromMimeData = self.insert_plain_text_only
         
-        # エディタのスタイリング
-        self.markdown_editor.setStyleSheet("""
-            QTextEdit#markdownEditor {
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                background-color: white;
-                font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
-                font-size: 13px;
-                line-height: 1.4;
-                padding: 8px;
-            }
-            QTextEdit#markdownEditor:focus {
-                border-color: #3498db;
-            }
-        """)
         
         layout.addWidget(self.markdown_editor, 1)
         
         # エディタの状態管理
         self.editor_modified = False
         self.current_editing_file = None
+        self.current_file_encoding = 'utf-8'  # 編集中のファイルを保存する文字コード
         
         return center_widget
         
@@ -518,276 +1102,52 @@ class MarkdownToPdfConverter(QMainWindow):
         
         layout.addWidget(header_widget)
         
-        # プレビューエリア（残りの全スペースを使用）
-        self.web_view = QWebEngineView()
+        # プレビューエリア（WebEngineは最初のプレビュー時に生成し、それまでは仮表示）
+        self.web_view = None
+        self.preview_layout = layout
+        self.preview_placeholder = QLabel("プレビューを準備中...")
+        self.preview_placeholder.setObjectName("previewPlaceholder")
+        self.preview_placeholder.setAlignment(Qt.AlignCenter)
+        self.preview_placeholder.setMinimumHeight(300)
+        layout.addWidget(self.preview_placeholder, 1)  # ストレッチファクター1を設定
+        
+        return right_widget
+        
+    def ensure_web_view(self):
+        """プレビュー用のWebEngineビューを取得（初回のみ生成）"""
+        if self.web_view is not None:
+            return self.web_view
+        
+        # QtWebEngineは読み込みが重いため、実際に必要になるまでインポートしない
+        self.setup_webengine()
+        self.web_view = load_webengine().QWebEngineView()
         self.web_view.setObjectName("webView")
         self.web_view.setMinimumHeight(300)
         # 横長表示を防ぐために最大幅を設定
         self.web_view.setSizePolicy(self.web_view.sizePolicy().horizontalPolicy(), self.web_view.sizePolicy().verticalPolicy())
-        layout.addWidget(self.web_view, 1)  # ストレッチファクター1を設定
+        self.web_view.setZoomFactor(self.current_zoom)
         
-        return right_widget
+        # 仮表示と置き換える
+        self.preview_layout.replaceWidget(self.preview_placeholder, self.web_view)
+        self.preview_placeholder.deleteLater()
+        self.preview_placeholder = None
+        return self.web_view
         
     def apply_professional_styling(self):
-        """プロフェッショナルなスタイリングを適用"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            
-            QLabel#titleLabel {
-                font-size: 18px;
-                font-weight: bold;
-                color: #2c3e50;
-                padding: 10px 0;
-                border-bottom: 2px solid #3498db;
-                margin-bottom: 10px;
-            }
-            
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #bdc3c7;
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 10px;
-                background-color: white;
-            }
-            
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                color: #2c3e50;
-                background-color: white;
-            }
-            
-            QPushButton#convertButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 12px;
-            }
-            
-            QPushButton#convertButton:hover {
-                background-color: #2980b9;
-            }
-            
-            QPushButton#convertButton:pressed {
-                background-color: #1c5985;
-            }
-            
-            QPushButton#convertButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-            
-            QPushButton#browseButton {
-                background-color: #27ae60;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 6px 8px;
-            }
-            
-            QPushButton#browseButton:hover {
-                background-color: #229954;
-            }
-            
-            QPushButton#clearButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 6px 8px;
-            }
-            
-            QPushButton#clearButton:hover {
-                background-color: #c0392b;
-            }
-            
-            QPushButton#newFileButton {
-                background-color: #9b59b6;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 6px 8px;
-            }
-            
-            QPushButton#newFileButton:hover {
-                background-color: #8e44ad;
-            }
-            
-            QLineEdit {
-                border: 2px solid #bdc3c7;
-                border-radius: 4px;
-                padding: 8px;
-                font-size: 13px;
-                background-color: white;
-            }
-            
-            QLineEdit:focus {
-                border-color: #3498db;
-            }
-            
-            QScrollArea#fileScrollArea {
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                background-color: white;
-            }
-            
-            QScrollArea#fileScrollArea QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 12px;
-                border-radius: 6px;
-            }
-            
-            QScrollArea#fileScrollArea QScrollBar::handle:vertical {
-                background: #bdc3c7;
-                border-radius: 6px;
-                min-height: 20px;
-            }
-            
-            QScrollArea#fileScrollArea QScrollBar::handle:vertical:hover {
-                background: #95a5a6;
-            }
-            
-            QLabel#statusLabel {
-                color: #34495e;
-                font-size: 12px;
-                padding: 8px;
-                background-color: #ecf0f1;
-                border-radius: 4px;
-            }
-            
-            QLabel#previewLabel {
-                font-size: 16px;
-                font-weight: bold;
-                color: #2c3e50;
-            }
-            
-            QProgressBar {
-                border: 2px solid #bdc3c7;
-                border-radius: 4px;
-                text-align: center;
-                font-weight: bold;
-            }
-            
-            QProgressBar::chunk {
-                background-color: #3498db;
-                border-radius: 2px;
-            }
-            
-            QCheckBox {
-                spacing: 8px;
-                font-size: 13px;
-            }
-            
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-            }
-            
-            QCheckBox::indicator:unchecked {
-                border: 2px solid #bdc3c7;
-                border-radius: 3px;
-                background-color: white;
-            }
-            
-            QCheckBox::indicator:checked {
-                border: 2px solid #3498db;
-                border-radius: 3px;
-                background-color: #3498db;
-            }
-            
-            QWebEngineView#webView {
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                background-color: #f0f0f0;
-            }
-            
-            QLabel#editorLabel {
-                font-size: 16px;
-                font-weight: bold;
-                color: #2c3e50;
-            }
-            
-            QPushButton#saveButton {
-                background-color: #27ae60;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-size: 11px;
-                font-weight: bold;
-                padding: 4px 8px;
-            }
-            
-            QPushButton#saveButton:hover {
-                background-color: #229954;
-            }
-            
-            QPushButton#saveButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-            
-            QPushButton#reloadButton {
-                background-color: #f39c12;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-size: 11px;
-                font-weight: bold;
-                padding: 4px 8px;
-            }
-            
-            QPushButton#reloadButton:hover {
-                background-color: #e67e22;
-            }
-            
-            QPushButton#reloadButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-
-        """)
+        """プロフェッショナルなスタイリングを適用（スタイルシートは起動時に一度だけ読み込む）"""
+        qss_path = Path(__file__).parent / "resources" / "app.qss"
+        try:
+            self.setStyleSheet(qss_path.read_text(encoding='utf-8'))
+        except OSError as e:
+            print(f"スタイルシートの読み込みに失敗: {qss_path} - {e}")
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
-            self.drop_area.setStyleSheet("""
-                QLabel#dropArea {
-                    border: 2px dashed #007bff;
-                    border-radius: 8px;
-                    background-color: #e3f2fd;
-                    color: #0056b3;
-                    font-size: 14px;
-                }
-            """)
+            self.set_drop_highlight(True)
             
     def dragLeaveEvent(self, event):
-        self.drop_area.setStyleSheet("""
-            QLabel#dropArea {
-                border: 2px dashed #cccccc;
-                border-radius: 8px;
-                background-color: #f8f9fa;
-                color: #6c757d;
-                font-size: 14px;
-            }
-            QLabel#dropArea:hover {
-                border-color: #007bff;
-                background-color: #e3f2fd;
-            }
-        """)
+        self.set_drop_highlight(False)
             
     def dropEvent(self, event: QDropEvent):
         files = [u.toLocalFile() for u in event.mimeData().urls()]
@@ -796,19 +1156,13 @@ class MarkdownToPdfConverter(QMainWindow):
         if markdown_files:
             self.add_files(markdown_files)
             
-        self.drop_area.setStyleSheet("""
-            QLabel#dropArea {
-                border: 2px dashed #cccccc;
-                border-radius: 8px;
-                background-color: #f8f9fa;
-                color: #6c757d;
-                font-size: 14px;
-            }
-            QLabel#dropArea:hover {
-                border-color: #007bff;
-                background-color: #e3f2fd;
-            }
-        """)
+        self.set_drop_highlight(False)
+        
+    def set_drop_highlight(self, active):
+        """ドラッグ中のドロップエリア強調表示を切り替え"""
+        self.drop_area.setProperty("dragOver", active)
+        self.drop_area.style().unpolish(self.drop_area)
+        self.drop_area.style().polish(self.drop_area)
             
     def browse_input_files(self):
         file_paths, _ = QFileDialog.getOpenFileNames(
@@ -905,15 +1259,24 @@ class MarkdownToPdfConverter(QMainWindow):
     def add_files(self, file_paths):
         """ファイルをリストに追加"""
         for file_path in file_paths:
-            if file_path not in self.current_files:
+            # 大文字小文字や相対パスの違いによる重複も除外
+            key = path_key(file_path)
+            if key not in self._path_to_item:
                 self.current_files.append(file_path)
                 
-                # ファイルアイテムを作成
-                file_item = FileItem(file_path, self)
+                # ファイルアイテムを作成（プールに空きがあれば再利用）
+                if self._item_pool:
+                    file_item = self._item_pool.pop()
+                    file_item.rebind(file_path)
+                else:
+                    file_item = FileItem(file_path, self)
+                file_item.list_index = len(self.file_items)
                 self.file_items.append(file_item)
+                self._path_to_item[key] = file_item
                 
                 # スペーサーの前に挿入
                 self.file_layout.insertWidget(self.file_layout.count() - 1, file_item)
+                file_item.show()
         
         self.update_ui_state()
         
@@ -927,34 +1290,45 @@ class MarkdownToPdfConverter(QMainWindow):
         
         # ファイルアイテムを削除
         for item in self.file_items:
-            self.file_layout.removeWidget(item)
-            item.deleteLater()
+            self.release_file_item(item)
         self.file_items.clear()
+        self._path_to_item.clear()
+        self._current_selected = None
         
         self.current_file_index = 0
-        self.web_view.setHtml("")
+        self._load_timer.stop()
+        self._pending_path = None
+        if self.web_view is not None:
+            self.web_view.setHtml("")
         
         # エディタもクリア
         self.clear_editor()
         
         self.update_ui_state()
         
+    def release_file_item(self, item):
+        """ファイルアイテムをリストから外してプールに戻す"""
+        self.file_layout.removeWidget(item)
+        item.hide()
+        item.set_selected(False)
+        self._item_pool.append(item)
+        
     def remove_single_file(self, file_path):
         """単一ファイルを削除"""
-        if file_path in self.current_files:
-            # 削除するファイルのインデックスを取得
-            remove_index = self.current_files.index(file_path)
+        item = self._path_to_item.pop(path_key(file_path), None)
+        if item is not None:
+            remove_index = item.list_index
             
             # リストから削除
-            self.current_files.remove(file_path)
-            
-            # ファイルアイテムを削除
-            for i, item in enumerate(self.file_items):
-                if item.file_path == file_path:
-                    self.file_layout.removeWidget(item)
-                    item.deleteLater()
-                    self.file_items.pop(i)
-                    break
+            del self.current_files[remove_index]
+            del self.file_items[remove_index]
+            self.release_file_item(item)
+            if item is self._current_selected:
+                self._current_selected = None
+            
+            # 後続アイテムの位置を詰める
+            for i in range(remove_index, len(self.file_items)):
+                self.file_items[i].list_index = i
             
             # 現在のファイルインデックスを調整
             if remove_index <= self.current_file_index:
@@ -968,7 +1342,10 @@ class MarkdownToPdfConverter(QMainWindow):
                 
                 self.select_file_item(self.file_items[self.current_file_index])
             else:
-                self.web_view.setHtml("")
+                self._load_timer.stop()
+                self._pending_path = None
+                if self.web_view is not None:
+                    self.web_view.setHtml("")
                 self.current_file_index = 0
                 self.clear_editor()
             
@@ -976,18 +1353,46 @@ class MarkdownToPdfConverter(QMainWindow):
          
     def select_file_item(self, selected_item):
         """ファイルアイテムを選択"""
-        # 全てのアイテムの選択を解除
-        for item in self.file_items:
-            item.set_selected(False)
+        # 選択中のアイテムを再度クリックした場合は再読み込みしない
+        if selected_item is self._current_selected:
+            self.current_file_index = selected_item.list_index
+            return
+        
+        # 直前に選択していたアイテムの選択を解除
+        if self._current_selected is not None:
+            self._current_selected.set_selected(False)
         
         # 選択されたアイテムを選択状態にする
         selected_item.set_selected(True)
+        self._current_selected = selected_item
         
         # インデックスを更新
-        self.current_file_index = self.file_items.index(selected_item)
+        self.current_file_index = selected_item.list_index
+        
+        # プレビューを更新（連続クリック時は操作が落ち着いてから読み込む）
+        self._pending_path = selected_item.file_path
+        self._load_timer.start(SELECT_DEBOUNCE_MS)
         
-        # プレビューを更新
-        self.load_markdown_file(selected_item.file_path)
+    def refresh_preview(self):
+        """変換オプションの変更をプレビューに反映"""
+        if self.editor_modified and self.current_editing_file:
+            # 未保存の編集内容はファイルから読み直さず、エディタの内容で描画し直す
+            self.update_editor_preview()
+        elif self._current_selected is not None:
+            self._pending_path = self._current_selected.file_path
+            self._load_timer.start(SELECT_DEBOUNCE_MS)
+            
+    def on_pagebreak_marker_edited(self):
+        """改ページマーカーが編集された場合のみプレビューを更新"""
+        if self.pagebreak_input.isModified():
+            self.pagebreak_input.setModified(False)
+            self.refresh_preview()
+        
+    def _do_load_pending(self):
+        """保留中のファイルを読み込む"""
+        if self._pending_path:
+            self.load_markdown_file(self._pending_path)
+            self._pending_path = None
         
     def update_ui_state(self):
         """UIの状態を更新"""
@@ -1008,36 +1413,91 @@ class MarkdownToPdfConverter(QMainWindow):
             self.output_folder.setText(folder_path)
             
     def load_markdown_file(self, file_path):
+        """ファイルの読み込みとHTML変換をワーカースレッドで開始"""
+        # 実行中のワーカーには中断を要求（結果は破棄される）
+        for worker in self._load_workers:
+            worker.requestInterruption()
+        
+        page_break_marker = self.pagebreak_input.text() or self.page_break_marker
+        worker = MarkdownWorker(self, file_path, self.include_toc.isChecked(), page_break_marker,
+                                self.use_mistune.isChecked())
+        worker.loaded.connect(self.on_markdown_loaded)
+        worker.finished.connect(lambda: self._load_workers.remove(worker))
+        self._load_workers.append(worker)
+        worker.start()
+        
+    def on_markdown_loaded(self, file_path, content, html_content, error, encoding):
+        """ワーカースレッドでの読み込み・変換完了時の処理"""
+        # 別のファイルが選択済みの場合は古い結果を破棄
+        item = self.current_file_item()
+        if item is None or file_path != item.file_path:
+            return
+        
+        if error:
+            QMessageBox.critical(self, "エラー", f"ファイルの読み込みに失敗しました:\n{error}")
+            return
+        
+        # デフォルトの出力フォルダを設定
+        if not self.output_folder.text():
+            self.output_folder.setText(str(Path(file_path).parent))
+        
+        # エディタにコンテンツをロード
+        self.load_content_to_editor(content, file_path, encoding)
+        
+        # ベースURLを設定（ローカル画像の読み込み用）
+        self.set_preview_html(html_content, item.parent_url)
+        
+        # ファイル名を更新
+        if encoding == 'cp932':
+            self.status_label.setText(f"編集中: {item.display_name}.md（Shift_JIS）")
+        else:
+            self.status_label.setText(f"編集中: {item.display_name}.md")
+        
+        # ページ情報を更新（簡略化）
+        self.update_page_info()
+            
+    def current_file_item(self):
+        """選択中のファイルアイテムを返す（未選択ならNone）"""
+        if 0 <= self.current_file_index < len(self.file_items):
+            return self.file_items[self.current_file_index]
+        return None
+            
+    def set_preview_html(self, html_content, base_url):
+        """WebEngineビューにHTMLを表示"""
+        web_view = self.ensure_web_view()
+        previous_temp_file = self._html_temp_file
+        self._html_temp_file = self.load_html(web_view, html_content, base_url)
+        
+        # 前回の一時ファイルは不要になったので削除
+        if previous_temp_file:
+            self.remove_html_temp_file(previous_temp_file)
+            
+    def load_html(self, target, html_bytes, base_url):
+        """ビューまたはページにHTMLを読み込む（大きなHTMLは一時ファイル経由、作成した一時ファイルのパスを返す）"""
+        # UTF-8のバイト列のまま渡し、QString経由の変換を省く
+        if len(html_bytes) > LARGE_HTML_THRESHOLD:
+            # setContentはサイズ上限（約2MB）があるため、元ファイルと同じフォルダに書き出して読み込む
+            try:
+                with tempfile.NamedTemporaryFile('wb', suffix='.html', prefix='.md2pdf_preview_',
+                                                 dir=base_url.toLocalFile(), delete=False) as f:
+                    f.write(html_bytes)
+                target.load(QUrl.fromLocalFile(f.name))
+                return f.name
+            except OSError as e:
+                print(f"プレビュー用一時ファイルの作成に失敗: {e}")
+        
+        target.setContent(QByteArray(html_bytes), "text/html;charset=UTF-8", base_url)
+        return None
+            
+    def remove_html_temp_file(self, temp_file_path):
+        """プレビュー用の一時ファイルを削除"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # デフォルトの出力フォルダを設定
-            if not self.output_folder.text():
-                self.output_folder.setText(str(Path(file_path).parent))
-            
-            # エディタにコンテンツをロード
-            self.load_content_to_editor(content, file_path)
-            
-            # プレビューを更新
-            html_content = self.markdown_to_html(content)
-            
-            # ベースURLを設定（ローカル画像の読み込み用）
-            base_url = QUrl.fromLocalFile(str(Path(file_path).parent) + '/')
-            self.web_view.setHtml(html_content, base_url)
-            
-            # ファイル名を更新
-            file_name = Path(file_path).stem
-            self.status_label.setText(f"編集中: {file_name}.md")
-            
-            # ページ情報を更新（簡略化）
-            self.update_page_info()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "エラー", f"ファイルの読み込みに失敗しました:\n{str(e)}")
-            
-    def load_content_to_editor(self, content, file_path):
-        """コンテンツをエディタにロード"""
+            os.unlink(temp_file_path)
+        except OSError as e:
+            print(f"一時ファイルの削除に失敗: {temp_file_path} - {e}")
+        
+    def load_content_to_editor(self, content, file_path, encoding='utf-8'):
+        """コンテンツをエディタにロード（encodingは保存時に使う文字コード）"""
         # テキスト変更イベントを一時的に無効化
         self.markdown_editor.blockSignals(True)
         self.markdown_editor.setPlainText(content)
@@ -1045,6 +1505,7 @@ class MarkdownToPdfConverter(QMainWindow):
         
         # エディタの状態を更新
         self.current_editing_file = file_path
+        self.current_file_encoding = encoding
         self.editor_modified = False
         self.save_btn.setEnabled(False)
         self.reload_btn.setEnabled(True)
@@ -1056,12 +1517,20 @@ class MarkdownToPdfConverter(QMainWindow):
             self.save_btn.setEnabled(True)
             
             # リアルタイムプレビュー更新
-            content = self.markdown_editor.toPlainText()
-            html_content = self.markdown_to_html(content)
+            self.update_editor_preview()
             
-            # ベースURLを設定
-            base_url = QUrl.fromLocalFile(str(Path(self.current_editing_file).parent) + '/')
-            self.web_view.setHtml(html_content, base_url)
+    def update_editor_preview(self):
+        """エディタの内容でプレビューを更新"""
+        content = self.markdown_editor.toPlainText()
+        html_content = self.markdown_to_html(content)
+        
+        # ベースURLを設定
+        item = self.current_file_item()
+        if item is not None and item.file_path == self.current_editing_file:
+            base_url = item.parent_url
+        else:
+            base_url = QUrl.fromLocalFile(os.path.dirname(os.path.abspath(self.current_editing_file)) + os.sep)
+        self.set_preview_html(html_content, base_url)
             
     def save_current_file(self):
         """現在編集中のファイルを保存"""
@@ -1116,9 +1585,25 @@ class MarkdownToPdfConverter(QMainWindow):
                 # 既存ファイルの場合は上書き保存
                 file_path = self.current_editing_file
             
+            # 読み込んだときと同じ文字コードで保存（表現できない文字があればUTF-8への変更を確認）
+            encoding = self.current_file_encoding
+            try:
+                content.encode(encoding)
+            except UnicodeEncodeError:
+                reply = QMessageBox.question(
+                    self, "文字コードの確認",
+                    "Shift_JISで保存できない文字が含まれています。\nUTF-8で保存しますか？",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return
+                encoding = 'utf-8'
+            
             # ファイルに保存
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(file_path, 'w', encoding=encoding) as f:
                 f.write(content)
+            self.current_file_encoding = encoding
                 
             self.editor_modified = False
             self.save_btn.setEnabled(False)
@@ -1131,20 +1616,16 @@ class MarkdownToPdfConverter(QMainWindow):
             
     def update_file_path_in_lists(self, old_path, new_path):
         """ファイルパスの変更をリストとUIに反映"""
+        item = self._path_to_item.pop(path_key(old_path), None)
+        if item is None:
+            return
+        
         # current_filesリストを更新
-        for i, file_path in enumerate(self.current_files):
-            if file_path == old_path:
-                self.current_files[i] = new_path
-                break
+        self.current_files[item.list_index] = new_path
+        self._path_to_item[path_key(new_path)] = item
         
-        # file_itemsのパスとラベルを更新
-        for item in self.file_items:
-            if item.file_path == old_path:
-                item.file_path = new_path
-                # ファイル名ラベルを更新
-                item.file_label.setText(Path(new_path).name)
-                item.file_label.setToolTip(new_path)
-                break
+        # file_itemsのパス・ラベル・ベースURLを更新
+        item.set_file_path(new_path)
             
     def reload_current_file(self):
         """現在のファイルを再読み込み"""
@@ -1169,6 +1650,7 @@ class MarkdownToPdfConverter(QMainWindow):
         self.markdown_editor.blockSignals(False)
         
         self.current_editing_file = None
+        self.current_file_encoding = 'utf-8'
         self.editor_modified = False
         self.save_btn.setEnabled(False)
         self.reload_btn.setEnabled(False)
@@ -1202,434 +1684,454 @@ class MarkdownToPdfConverter(QMainWindow):
         """ズームイン"""
         if self.current_zoom < 3.0:
             self.current_zoom += 0.1
-            self.web_view.setZoomFactor(self.current_zoom)
+            if self.web_view is not None:
+                self.web_view.setZoomFactor(self.current_zoom)
             self.zoom_info.setText(f"{int(self.current_zoom * 100)}%")
             
     def zoom_out(self):
         """ズームアウト"""
         if self.current_zoom > 0.3:
             self.current_zoom -= 0.1
-            self.web_view.setZoomFactor(self.current_zoom)
+            if self.web_view is not None:
+                self.web_view.setZoomFactor(self.current_zoom)
             self.zoom_info.setText(f"{int(self.current_zoom * 100)}%")
             
-    def markdown_to_html(self, markdown_content):
-        """MarkdownをHTMLに変換"""
-        # 改ページマーカーを処理
+    def get_markdown(self, include_toc, for_pdf, use_mistune):
+        """変換設定に応じたMarkdownインスタンスを取得（初回のみ生成）"""
+        md = self._md_instances.get((include_toc, for_pdf, use_mistune))
+        if md is None:
+            # Pygmentsによるハイライトは PDF 出力時のみ行う
+            md = create_markdown_converter(include_toc, highlight_code=for_pdf, use_mistune=use_mistune)
+            self._md_instances[(include_toc, for_pdf, use_mistune)] = md
+        return md
+        
+    def markdown_to_html(self, markdown_content, use_disk_cache=False, for_pdf=False):
+        """MarkdownをHTMLに変換（現在の変換オプションを使用）"""
+        return build_html_document(self.markdown_to_body(markdown_content, use_disk_cache, for_pdf), for_pdf)
+        
+    def markdown_to_body(self, markdown_content, use_disk_cache=False, for_pdf=False):
+        """Markdownを本文HTMLに変換（現在の変換オプションを使用）"""
         page_break_marker = self.pagebreak_input.text() or self.page_break_marker
-        markdown_content = markdown_content.replace(
-            page_break_marker, 
-            '<div class="page-break" style="page-break-after: always;"></div>'
+        return self.render_body(markdown_content, self.include_toc.isChecked(), page_break_marker,
+                                use_disk_cache, for_pdf, self.use_mistune.isChecked())
+        
+    def render_html(self, markdown_content, include_toc, page_break_marker, use_disk_cache=False,
+                    for_pdf=False, use_mistune=False):
+        """オプションを指定してMarkdownをHTMLに変換（ワーカースレッドからも呼び出し可能）"""
+        body_html = self.render_body(markdown_content, include_toc, page_break_marker, use_disk_cache, for_pdf,
+                                     use_mistune)
+        return build_html_document(body_html, for_pdf)
+        
+    def render_body(self, markdown_content, include_toc, page_break_marker, use_disk_cache=False,
+                    for_pdf=False, use_mistune=False):
+        """オプションを指定してMarkdownを本文HTMLに変換（キャッシュを利用）"""
+        content_bytes = markdown_content.encode('utf-8')
+        cache_key = (
+            hashlib.blake2b(content_bytes, digest_size=16).digest(),
+            include_toc,
+            page_break_marker,
+            for_pdf,
+            use_mistune,
         )
         
-        # Markdown拡張機能の設定
-        extensions = [
-            'fenced_code',
-            'tables',
-            'toc' if self.include_toc.isChecked() else None,
-            'nl2br',
-            'sane_lists',
-            'codehilite',
-            'attr_list',
-            'def_list',
-            'footnotes',
-            'md_in_html',
-            'meta',
-        ]
-        extensions = [ext for ext in extensions if ext]
-        
-        # MarkdownをHTMLに変換
-        md = markdown.Markdown(extensions=extensions)
-        body_html = md.convert(markdown_content)
-        
-        # HTML生成（Mermaidを簡素化）
-        html_template = f'''
-<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="color-scheme" content="light">
-    <meta name="print-color-adjust" content="exact">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', 'Hiragino Sans', Arial, 'Meiryo', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 900px;
-            margin: 20px auto;
-            padding: 20px;
-            background: white;
-            box-shadow: 0 0 10px rgba(0,0,0,0.1);
-            border-radius: 4px;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
-            margin-top: 24px;
-            margin-bottom: 16px;
-            font-weight: 600;
-            line-height: 1.25;
-        }}
-        h1 {{ font-size: 2em; border-bottom: 1px solid #eaecef; padding-bottom: .3em; }}
-        h2 {{ font-size: 1.5em; border-bottom: 1px solid #eaecef; padding-bottom: .3em; }}
-        h3 {{ font-size: 1.25em; }}
-        code {{
-            background-color: rgba(27,31,35,.05);
-            border-radius: 3px;
-            font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
-            font-size: 85%;
-            margin: 0;
-            padding: .2em .4em;
-        }}
-        pre {{
-            background-color: #f6f8fa;
-            border-radius: 3px;
-            font-size: 85%;
-            line-height: 1.45;
-            overflow: auto;
-            padding: 16px;
-        }}
-        pre code {{
-            background-color: transparent;
-            border: 0;
-            display: inline;
-            line-height: inherit;
-            margin: 0;
-            overflow: visible;
-            padding: 0;
-            word-wrap: normal;
-        }}
-        table {{
-            border-collapse: collapse;
-            margin: 16px 0;
-            width: 100%;
-            display: table;
-        }}
-        table th, table td {{
-            border: 1px solid #dfe2e5;
-            padding: 6px 13px;
-        }}
-        table th {{
-            background-color: #f6f8fa;
-            font-weight: 600;
-        }}
-        blockquote {{
-            border-left: 4px solid #dfe2e5;
-            color: #6a737d;
-            padding-left: 16px;
-            margin: 16px 0;
-        }}
-        img {{
-            max-width: 100%;
-            height: auto;
-            -webkit-print-color-adjust: exact !important;
-            print-color-adjust: exact !important;
-        }}
-        .mermaid {{
-            text-align: center;
-            margin: 16px 0;
-            padding: 16px;
-            background-color: #f8f9fa;
-            border: 1px solid #e9ecef;
-            border-radius: 4px;
-        }}
-        /* 印刷用スタイル */
-        @media print {{
-            body {{
-                margin: 0;
-                padding: 10mm;
-                font-size: 10pt;
-                color: #333 !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            .page-break {{
-                page-break-after: always;
-                break-after: page;
-            }}
-            h1, h2, h3 {{
-                page-break-after: avoid;
-                color: #333 !important;
-            }}
-            pre, table, blockquote {{
-                page-break-inside: avoid;
-            }}
-            code {{
-                background-color: rgba(27,31,35,.05) !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            pre {{
-                background-color: #f6f8fa !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            table th {{
-                background-color: #f6f8fa !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            blockquote {{
-                border-left: 4px solid #dfe2e5 !important;
-                color: #6a737d !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            .mermaid {{
-                background-color: #f8f9fa !important;
-                border: 1px solid #e9ecef !important;
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-            img {{
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-                color-adjust: exact !important;
-            }}
-            * {{
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    {body_html}
-    <script>
-        // Mermaidコードブロックを処理（エラーハンドリング付き）
-        try {{
-            if (typeof document !== 'undefined' && document.querySelectorAll) {{
-                document.querySelectorAll('pre code.language-mermaid').forEach(function(element) {{
-                    try {{
-                        const mermaidCode = element.textContent;
-                        const mermaidDiv = document.createElement('div');
-                        mermaidDiv.className = 'mermaid';
-                        mermaidDiv.innerHTML = '<pre style="text-align: left; background: #f8f9fa; padding: 10px; border-radius: 4px;"><code>' + 
-                                              mermaidCode.replace(/</g, '&lt;').replace(/>/g, '&gt;') + '</code></pre>';
-                        if (element.parentNode && element.parentNode.parentNode) {{
-                            element.parentNode.parentNode.replaceChild(mermaidDiv, element.parentNode);
-                        }}
-                    }} catch (e) {{
-                        console.log('Mermaid processing error:', e);
-                    }}
-                }});
-            }}
-        }} catch (e) {{
-            console.log('Document processing error:', e);
-        }}
-    </script>
-</body>
-</html>
-'''
-        return html_template
+        # キャッシュとMarkdownインスタンスはスレッド間で共有するためロックする
+        with self._md_lock:
+            # 変換済みの本文HTMLがキャッシュにあれば再利用
+            body_html = self._html_cache.get(cache_key)
+            if body_html is not None:
+                self._html_cache.move_to_end(cache_key)
+                return body_html
+        
+        # ディスクキャッシュを確認（前回起動時の変換結果を再利用）
+        disk_cache_path = None
+        if use_disk_cache and self._disk_cache_dir is not None:
+            disk_cache_path = self._disk_cache_dir / disk_cache_name(content_bytes, include_toc, page_break_marker,
+                                                                     for_pdf, use_mistune)
+            body_html = load_cached_html(disk_cache_path)
+        
+        converted = body_html is None
+        with self._md_lock:
+            if converted:
+                # MarkdownをHTMLに変換（インスタンスは使い回す）
+                body_html = convert_markdown_body(self.get_markdown(include_toc, for_pdf, use_mistune),
+                                                  markdown_content, page_break_marker)
+            
+            # キャッシュに登録（上限を超えたら最も古いものを破棄）
+            self._html_cache[cache_key] = body_html
+            if len(self._html_cache) > HTML_CACHE_SIZE:
+                self._html_cache.popitem(last=False)
+        
+        # ディスクへの書き込みはロックの外で行い、エディタからの変換を待たせない
+        if converted and disk_cache_path is not None:
+            store_cached_html(disk_cache_path, body_html)
+        
+        return body_html
         
     def convert_to_pdf(self):
         if not self.current_files or not self.output_folder.text():
             QMessageBox.warning(self, "警告", "入力ファイルと出力先を指定してください")
             return
             
-        # 複数ファイルの連続変換を開始
-        self.current_conversion_index = 0
-        self.total_files = len(self.current_files)
+        # 複数ファイルの変換を開始（空いているページで並行して処理）
+        # 変換対象のパス・表示名・ベースURLと出力先は開始時に確定し、ファイルごとに作り直さない
+        self.conversion_targets = [(item.file_path, item.display_name, item.parent_url) for item in self.file_items]
+        self.output_dir = Path(self.output_folder.text())
+        self.current_conversion_index = 0  # 次に変換を開始するファイルの位置
+        self.completed_conversions = 0
+        self.total_files = len(self.conversion_targets)
         self.conversion_errors = []
+        self.skipped_files = 0
+        self.overwrite_policy = None  # 「すべてはい/いいえ」を選んだ場合の上書き方針
+        self.is_converting = True
         
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.convert_btn.setEnabled(False)
         
+        # PDF生成には画面に表示しないWebEngineページを使用する
+        self.ensure_pdf_pages()
+        
+        # Markdownの変換は別プロセスで先行させ、PDF生成と並行して進める
+        self.start_html_prefetch()
         self.convert_next_file()
         
+    def ensure_pdf_pages(self):
+        """一括変換用のWebEngineページを用意（初回のみ生成）"""
+        if self._pdf_pages:
+            return self._pdf_pages
+        
+        # WebEngineの設定はプレビュー用ビューの生成時に行われる
+        self.ensure_web_view()
+        
+        for _ in range(PDF_PAGE_POOL_SIZE):
+            page = load_webengine().QWebEnginePage(self)
+            # ページからの通知は、種類を付けてそのページで実行中の変換手順に渡す
+            page.loadFinished.connect(lambda success, page=page: self.resume_conversion(page, ('load', success)))
+            page.pdfPrintingFinished.connect(
+                lambda file_path, success, page=page: self.resume_conversion(page, ('pdf', file_path, success)))
+            self._pdf_pages.append(page)
+        return self._pdf_pages
+        
+    def start_html_prefetch(self):
+        """一括変換対象のHTML変換をプロセスプールで開始"""
+        self._prefetch_futures = {}
+        # 編集中のファイルはエディタの内容を使うため対象外（最新のPDFがありスキップするものも除く）
+        skip_uptodate = self.skip_uptodate.isChecked()
+        paths = []
+        for path, file_name, _ in self.conversion_targets:
+            if path == self.current_editing_file:
+                continue
+            if skip_uptodate and self.should_skip_conversion(path, stat_mtime(self.output_dir / f"{file_name}.pdf")):
+                continue
+            paths.append(path)
+        if len(paths) < PREFETCH_MIN_FILES:
+            return
+        
+        page_break_marker = self.pagebreak_input.text() or self.page_break_marker
+        include_toc = self.include_toc.isChecked()
+        use_mistune = self.use_mistune.isChecked()
+        try:
+            if self._prefetch_executor is None:
+                # QtWebEngineやワーカースレッドが動いているプロセスをforkするとデッドロックしうるためspawnで起動
+                self._prefetch_executor = ProcessPoolExecutor(
+                    max_workers=min(os.cpu_count() or 1, PREFETCH_MAX_WORKERS),
+                    mp_context=multiprocessing.get_context('spawn'))
+            for path in paths:
+                future = self._prefetch_executor.submit(
+                    _convert_one, path, include_toc, page_break_marker, self._disk_cache_dir, use_mistune)
+                # 完了はプールのスレッドで通知されるため、シグナル経由でGUIスレッドに渡す
+                future.add_done_callback(lambda _: self.prefetch_done.emit())
+                self._prefetch_futures[path] = future
+        except Exception as e:
+            # プロセスを起動できない環境では従来どおり順次変換する（壊れたプールは次回作り直す）
+            print(f"HTMLの先行変換を開始できません: {e}")
+            self.stop_html_prefetch()
+            self.shutdown_prefetch_pool()
+            
+    def stop_html_prefetch(self):
+        """未着手の先行変換を中止（プロセスプールは次の一括変換で使い回す）"""
+        for future in self._prefetch_futures.values():
+            future.cancel()
+        self._prefetch_futures = {}
+        
+    def shutdown_prefetch_pool(self):
+        """先行変換のプロセスプールを終了"""
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False)
+            self._prefetch_executor = None
+        
     def convert_next_file(self):
-        """次のファイルを変換"""
-        if self.current_conversion_index >= self.total_files:
-            # すべてのファイルの変換が完了
-            self.on_all_conversions_finished()
+        """空いているページで次のファイルの変換を開始"""
+        # 上書き確認の表示中に呼ばれた場合は、表示元の呼び出しが続けて割り当てる
+        if not self.is_converting or self._dispatching:
             return
+        
+        self._dispatching = True
+        try:
+            while self.current_conversion_index < self.total_files:
+                page = next((p for p in self._pdf_pages if p not in self._pdf_jobs), None)
+                if page is None or not self.start_conversion(page):
+                    break
+        finally:
+            self._dispatching = False
+        
+        # 変換中のページがなく、残りのファイルもなければ完了
+        if not self._pdf_jobs and self.current_conversion_index >= self.total_files:
+            self.on_all_conversions_finished()
             
-        current_file = self.current_files[self.current_conversion_index]
-        file_name = Path(current_file).stem
+    def start_conversion(self, page):
+        """指定したページで次のファイルの変換を開始（先行変換や同名PDFの変換の完了待ちならFalse）"""
+        current_file, file_name, base_url = self.conversion_targets[self.current_conversion_index]
         
-        self.status_label.setText(f"変換中 ({self.current_conversion_index + 1}/{self.total_files}): {file_name}.md")
+        # 出力パスを生成（既存PDFの有無と更新日時は1回のstatで調べる）
+        output_path = self.output_dir / f"{file_name}.pdf"
+        # 同じ名前のPDFを別のページで変換中なら、その完了を待ってから（上書き確認も含めて）開始する
+        output_key = path_key(output_path)
+        if any(path_key(job['output_path']) == output_key for job in self._pdf_jobs.values()):
+            return False
+        output_mtime = stat_mtime(output_path)
         
-        # 全体進捗を更新（ファイル開始時点で基本進捗を設定）
-        overall_progress = int((self.current_conversion_index * 100) / self.total_files)
-        self.progress_bar.setValue(overall_progress)
+        # PDFが元ファイルより新しければ変換しない
+        if self.should_skip_conversion(current_file, output_mtime):
+            self.current_conversion_index += 1
+            self.skipped_files += 1
+            self.completed_conversions += 1
+            self.update_conversion_progress()
+            return True
         
-        # 出力パスを生成
-        output_path = Path(self.output_folder.text()) / f"{file_name}.pdf"
+        # 先行変換中のHTMLがまだ準備できていなければ、完了の通知（prefetch_done）を待つ
+        future = self._prefetch_futures.get(current_file)
+        if future is not None and not future.done():
+            return False
         
-        # 上書き確認
-        if output_path.exists() and self.confirm_overwrite.isChecked():
-            reply = QMessageBox.question(
-                self, "上書き確認", 
-                f"ファイル '{output_path.name}' は既に存在します。\n上書きしますか？",
-                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
-            )
+        self.current_conversion_index += 1
+        self.update_conversion_progress(f"変換中 ({self.current_conversion_index}/{self.total_files}): {file_name}.md")
+        
+        # 上書き確認（「すべて」を選んだ後は残りのファイルにも同じ方針を適用）
+        if output_mtime is not None and self.confirm_overwrite.isChecked():
+            reply = self.overwrite_policy
+            if reply is None:
+                reply = QMessageBox.question(
+                    self, "上書き確認", 
+                    f"ファイル '{output_path.name}' は既に存在します。\n上書きしますか？",
+                    QMessageBox.Yes | QMessageBox.YesToAll | QMessageBox.No | QMessageBox.NoToAll | QMessageBox.Cancel
+                )
+                if reply == QMessageBox.YesToAll:
+                    self.overwrite_policy = reply = QMessageBox.Yes
+                elif reply == QMessageBox.NoToAll:
+                    self.overwrite_policy = reply = QMessageBox.No
             
             if reply == QMessageBox.Cancel:
-                self.on_all_conversions_finished()
-                return
+                # 残りのファイルは開始しない（変換中のものは完了を待つ）
+                self.current_conversion_index = self.total_files
+                return True
             elif reply == QMessageBox.No:
                 # このファイルをスキップして次へ
-                self.current_conversion_index += 1
-                self.convert_next_file()
-                return
+                self.completed_conversions += 1
+                self.update_conversion_progress()
+                return True
+        
+        # このページで1ファイル分の変換手順を開始
+        job = {'file_name': file_name, 'output_path': str(output_path), 'temp_file': None}
+        job['steps'] = self.conversion_steps(page, job, current_file, base_url, future)
+        self._pdf_jobs[page] = job
+        self.resume_conversion(page)
+        return True
+        
+    def conversion_steps(self, page, job, current_file, base_url, future):
+        """1ファイル分の変換手順（yieldでページからの通知を待ち、その値を受け取って続行する）"""
+        def wait_for(kind):
+            """指定した種類の通知を待って値を返す（他の通知や別ファイルのPDF完了は読み飛ばす）"""
+            while True:
+                event = yield
+                if event[0] == kind and (kind != 'pdf' or event[1] == job['output_path']):
+                    return event[-1]
+        
+        # Markdownを本文HTMLに変換（現在編集中のファイルの場合はエディタの内容を使用）
+        body_html = None
+        if current_file == self.current_editing_file and self.markdown_editor.toPlainText().strip():
+            # エディタの内容を使用（編集中の場合）
+            content = self.markdown_editor.toPlainText()
+            body_html = self.markdown_to_body(content, for_pdf=True)
+        elif future is not None:
+            # 先行変換の結果を使用（失敗した場合はこのプロセスで変換し直す）
+            try:
+                _, body_html = future.result()
+            except BrokenProcessPool as e:
+                # 子プロセスが異常終了したプールは使えないため、次の一括変換で作り直す
+                print(f"HTMLの先行変換が中断されました: {current_file} - {e}")
+                self.shutdown_prefetch_pool()
+            except Exception as e:
+                print(f"HTMLの先行変換に失敗しました: {current_file} - {e}")
+        
+        if body_html is None:
+            # ファイルから読み込み（プレビューと同じく一括読み込み）
+            content = read_markdown_file(current_file)
+            body_html = self.markdown_to_body(content, use_disk_cache=True, for_pdf=True)
+        
+        # ローカル画像は同じ画像を使い回せるようdata URIで埋め込む
+        body_html = self.inline_local_images(body_html, base_url.toLocalFile())
+        
+        # WebEngineページでHTMLをロードし、loadFinishedを待つ
+        job['temp_file'] = self.load_html(page, build_html_document(body_html, for_pdf=True), base_url)
+        if not (yield from wait_for('load')):
+            raise ConversionError("HTMLのロードに失敗しました")
+        
+        # 固定時間は待たず、document.readyStateで読み込み完了を確認してからPDFを生成
+        def query_ready_state():
+            page.runJavaScript("document.readyState", lambda state: self.resume_conversion(page, ('ready', state)))
+        
+        query_ready_state()
+        while (yield from wait_for('ready')) != 'complete':
+            QTimer.singleShot(READY_POLL_MS, query_ready_state)
+        
+        # ページレイアウトの設定（カラー印刷対応）
+        page_layout = QPageLayout()
+        page_layout.setPageSize(QPageSize(QPageSize.A4))
+        page_layout.setOrientation(QPageLayout.Portrait)
+        
+        # printToPdfの正しい使用方法（レイアウト指定でカラー印刷）、pdfPrintingFinishedを待つ
+        page.printToPdf(job['output_path'], page_layout)
+        if not (yield from wait_for('pdf')):
+            raise ConversionError("変換に失敗しました")
+        
+    def resume_conversion(self, page, value=None):
+        """ページからの通知で変換手順を再開（手順が終わるか失敗したらそのファイルを終了して次に進む）"""
+        job = self._pdf_jobs.get(page)
+        if job is None:
+            # 終了済みの変換への通知は無視
+            return
+        steps = job['steps']
+        if steps.gi_running:
+            # 手順の実行中に届いた通知は、手順が待機状態になってから渡す
+            QTimer.singleShot(0, lambda: self.resume_conversion(page, value))
+            return
         
         try:
-            # MarkdownをHTMLに変換（現在編集中のファイルの場合はエディタの内容を使用）
-            if current_file == self.current_editing_file and self.markdown_editor.toPlainText().strip():
-                # エディタの内容を使用（編集中の場合）
-                content = self.markdown_editor.toPlainText()
-            else:
-                # ファイルから読み込み
-                with open(current_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            html_content = self.markdown_to_html(content)
-            
-            # 全体進捗を更新（HTML変換完了）
-            file_progress = int((self.current_conversion_index * 100) / self.total_files)
-            step_progress = int(20 / self.total_files)  # 各ファイルの20%進捗
-            self.progress_bar.setValue(file_progress + step_progress)
-            
-            # ベースURLを設定
-            base_url = QUrl.fromLocalFile(str(Path(current_file).parent) + '/')
-            
-            # WebEngineでHTMLをロード
-            self.current_output_path = str(output_path)
-            self.web_view.loadFinished.connect(self.on_html_loaded)
-            self.web_view.setHtml(html_content, base_url)
-            
+            steps.send(value)
+        except StopIteration:
+            self.finish_conversion(page)
         except Exception as e:
-            self.conversion_errors.append(f"{file_name}.md: {str(e)}")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            
-    def on_html_loaded(self, success):
-        """HTMLのロードが完了したらPDFを生成"""
-        if not success:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: HTMLのロードに失敗しました")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            return
-            
-        try:
-            # シグナルを切断
-            self.web_view.loadFinished.disconnect()
-            
-            # 全体進捗を更新（HTMLロード完了）
-            file_progress = int((self.current_conversion_index * 100) / self.total_files)
-            step_progress = int(40 / self.total_files)  # 各ファイルの40%進捗
-            self.progress_bar.setValue(file_progress + step_progress)
-            
-            # Mermaidのレンダリング完了を待つ（exe化で時間がかかる場合があるため延長）
-            QTimer.singleShot(3000, self.generate_pdf)
-            
-        except Exception as e:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: {str(e)}")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            
-    def generate_pdf(self):
-        """PDFを生成（プリンターを使わない方法）"""
+            self.finish_conversion(page, str(e))
+            
+    def inline_local_images(self, body_html, base_dir):
+        """ローカル画像の参照をdata URIに置き換える（埋め込むのは文書ごとに合計上限まで）"""
+        if '<img' not in body_html:
+            return body_html
+        
+        inlined = set()  # この文書で埋め込み済みの画像（2回目以降の参照はパスのまま読み込む）
+        remaining = INLINE_IMAGES_MAX_TOTAL
+        
+        def replace(match):
+            nonlocal remaining
+            src = match.group(2)
+            if src in inlined:
+                return match.group(0)
+            # base64で約4/3倍になるため、残りの上限に収まらない画像は読み込まない
+            data_uri = self.image_data_uri(src, base_dir, min(INLINE_IMAGE_MAX_BYTES, remaining * 3 // 4))
+            if data_uri is None or len(data_uri) > remaining:
+                return match.group(0)
+            inlined.add(src)
+            remaining -= len(data_uri)
+            return match.group(1) + data_uri + match.group(3)
+        
+        return _IMG_SRC_RE.sub(replace, body_html)
+        
+    def image_data_uri(self, src, base_dir, max_bytes):
+        """画像をdata URIに変換（同じ内容の画像は一度だけエンコード、max_bytesを超えるか対象外ならNone）"""
+        # http:やdata:などは対象外（1文字のスキームはWindowsのドライブ名）
+        scheme = _URL_SCHEME_RE.match(src)
+        if scheme and len(scheme.group(1)) > 1:
+            return None
+        
+        image_path = os.path.join(base_dir, unquote(unescape(src)))
+        mime_type = mimetypes.guess_type(image_path)[0]
+        if not mime_type or not mime_type.startswith('image/'):
+            return None
+        
         try:
-            # 全体進捗を更新（PDF生成開始）
-            file_progress = int((self.current_conversion_index * 100) / self.total_files)
-            step_progress = int(60 / self.total_files)  # 各ファイルの60%進捗
-            self.progress_bar.setValue(file_progress + step_progress)
-            
-            output_path = self.current_output_path
-            
-            # WebEnginePageのprintToPdfを使用（カラー印刷設定付き）
-            try:
-                # ページレイアウトの設定（カラー印刷対応）
-                page_layout = QPageLayout()
-                page_layout.setPageSize(QPageSize(QPageSize.A4))
-                page_layout.setOrientation(QPageLayout.Portrait)
+            stat = os.stat(image_path)
+            if stat.st_size > max_bytes:
+                return None
+            
+            # 変更されていないファイルは読み込まずにSHA-1を再利用
+            file_key = (path_key(image_path), stat.st_mtime_ns, stat.st_size)
+            digest = self._image_digests.get(file_key)
+            data = None
+            if digest is None:
+                data = Path(image_path).read_bytes()
+                digest = hashlib.sha1(data).hexdigest()
+                self._image_digests[file_key] = digest
+            
+            cache_key = (digest, mime_type)
+            data_uri = self._image_cache.get(cache_key)
+            if data_uri is None:
+                if data is None:
+                    data = Path(image_path).read_bytes()
+                data_uri = f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+                self._image_cache[cache_key] = data_uri
+                self._image_cache_size += len(data_uri)
                 
-                # printToPdfの正しい使用方法（レイアウト指定でカラー印刷）
-                self.web_view.page().printToPdf(output_path, page_layout)
-                # PDF生成完了を待つ（10秒後にチェック - exe化や複数ファイル処理で時間がかかる）
-                QTimer.singleShot(10000, lambda: self.check_pdf_generation(output_path))
-            except Exception as pdf_error:
-                # プリンターエラーが発生した場合
-                file_name = Path(self.current_files[self.current_conversion_index]).stem
-                self.conversion_errors.append(f"{file_name}.md: PDF生成エラー - {str(pdf_error)}")
-                self.current_conversion_index += 1
-                self.convert_next_file()
-            
-        except Exception as e:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: {str(e)}")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            
-    def check_pdf_generation(self, output_path):
-        """PDF生成の成功をチェック"""
-        try:
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                if file_size > 1024:  # 1KB以上あれば成功とみなす
-                    self.on_single_conversion_finished(True, output_path)
-                else:
-                    # ファイルサイズが小さい場合、さらに5秒待つ
-                    QTimer.singleShot(5000, lambda: self.check_pdf_generation_final(output_path))
+                # 上限を超えたら古いものから破棄
+                while self._image_cache_size > IMAGE_CACHE_MAX_BYTES and len(self._image_cache) > 1:
+                    _, evicted = self._image_cache.popitem(last=False)
+                    self._image_cache_size -= len(evicted)
             else:
-                # ファイルが存在しない場合、さらに5秒待つ
-                QTimer.singleShot(5000, lambda: self.check_pdf_generation_final(output_path))
-        except Exception as e:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: PDF生成チェックエラー - {str(e)}")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            
-    def check_pdf_generation_final(self, output_path):
-        """PDF生成の最終チェック（より寛容な判定）"""
-        try:
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                if file_size > 0:  # ファイルが存在して0バイトでなければ成功とみなす
-                    # ファイルサイズを確認してより詳細なログを出力
-                    file_name = Path(self.current_files[self.current_conversion_index]).stem
-                    print(f"PDF生成成功: {file_name}.pdf (サイズ: {file_size} bytes)")
-                    self.on_single_conversion_finished(True, output_path)
-                else:
-                    # 0バイトファイルの場合は失敗
-                    file_name = Path(self.current_files[self.current_conversion_index]).stem
-                    self.conversion_errors.append(f"{file_name}.md: PDFファイルが空です（0バイト）")
-                    self.current_conversion_index += 1
-                    self.convert_next_file()
-            else:
-                # ファイルが存在しない場合は失敗
-                file_name = Path(self.current_files[self.current_conversion_index]).stem
-                self.conversion_errors.append(f"{file_name}.md: PDFファイルが生成されませんでした")
-                self.current_conversion_index += 1
-                self.convert_next_file()
-        except Exception as e:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: PDF生成最終チェックエラー - {str(e)}")
-            self.current_conversion_index += 1
-            self.convert_next_file()
-            
-    def on_single_conversion_finished(self, success, output_path):
-        """単一ファイルの変換完了時の処理"""
-        if not success:
-            file_name = Path(self.current_files[self.current_conversion_index]).stem
-            self.conversion_errors.append(f"{file_name}.md: 変換に失敗しました")
-        
-        # 全体進捗を更新（ファイル完了）
-        file_progress = int(((self.current_conversion_index + 1) * 100) / self.total_files)
-        self.progress_bar.setValue(file_progress)
-        
-        # 次のファイルに進む
-        self.current_conversion_index += 1
+                self._image_cache.move_to_end(cache_key)
+        except OSError:
+            return None
+        return data_uri
+        
+    def should_skip_conversion(self, file_path, output_mtime):
+        """最新のPDFが既にあり変換を省略できるか判定（output_mtimeは出力PDFの更新日時、なければNone）"""
+        if output_mtime is None or not self.skip_uptodate.isChecked():
+            return False
+        # 未保存の編集内容があるファイルは常に変換する
+        if file_path == self.current_editing_file and self.editor_modified:
+            return False
+        source_mtime = stat_mtime(file_path)
+        return source_mtime is not None and output_mtime >= source_mtime
+            
+    def finish_conversion(self, page, error=None):
+        """ページでの変換を終了して次のファイルに進む（エラーはここでまとめて記録）"""
+        job = self._pdf_jobs.pop(page)
+        if job['temp_file']:
+            self.remove_html_temp_file(job['temp_file'])
+        if error:
+            self.conversion_errors.append(f"{job['file_name']}.md: {error}")
+        
+        self.completed_conversions += 1
+        self.update_conversion_progress()
         self.convert_next_file()
         
+    def update_conversion_progress(self, status_text=None):
+        """全体進捗の表示更新を予約（続けて呼ばれた更新はイベントループで1回にまとめる）"""
+        if status_text is not None:
+            self._progress_status = status_text
+        if not self._progress_pending:
+            self._progress_pending = True
+            QTimer.singleShot(0, self.apply_conversion_progress)
+            
+    def apply_conversion_progress(self):
+        """予約された進捗表示を反映（完了したファイル数の割合）"""
+        self._progress_pending = False
+        # 変換完了後に遅れて届いた更新で完了表示を上書きしない
+        if not self.is_converting:
+            return
+        self.progress_bar.setValue(int((self.completed_conversions * 100) / self.total_files))
+        if self._progress_status is not None:
+            self.status_label.setText(self._progress_status)
+            self._progress_status = None
+        
     def on_all_conversions_finished(self):
         """すべてのファイルの変換完了時の処理"""
+        self.is_converting = False
+        self.stop_html_prefetch()
         self.progress_bar.setValue(100)
         self.convert_btn.setEnabled(True)
         
-        success_count = self.total_files - len(self.conversion_errors)
+        success_count = self.total_files - len(self.conversion_errors) - self.skipped_files
+        skipped_message = f"スキップ（PDFが最新）: {self.skipped_files}個\n" if self.skipped_files else ""
         
         if len(self.conversion_errors) == 0:
             # すべて成功
@@ -1638,12 +2140,14 @@ class MarkdownToPdfConverter(QMainWindow):
                 self, "変換完了", 
                 f"すべてのファイルの変換が完了しました。\n\n"
                 f"変換されたファイル数: {success_count}\n"
+                f"{skipped_message}"
                 f"出力先: {self.output_folder.text()}"
             )
         else:
             # 一部または全部失敗
             self.status_label.setText(f"変換完了: 成功 {success_count}個, 失敗 {len(self.conversion_errors)}個")
-            error_message = f"変換結果:\n成功: {success_count}個\n失敗: {len(self.conversion_errors)}個\n\n"
+            error_message = (f"変換結果:\n成功: {success_count}個\n失敗: {len(self.conversion_errors)}個\n"
+                             f"{skipped_message}\n")
             error_message += "エラー詳細:\n" + "\n".join(self.conversion_errors[:5])
             if len(self.conversion_errors) > 5:
                 error_message += f"\n... 他 {len(self.conversion_errors) - 5}個のエラー"
@@ -1657,8 +2161,9 @@ class MarkdownToPdfConverter(QMainWindow):
         """一時ファイルをクリーンアップ"""
         for temp_file_path in self.temp_files:
             try:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+                os.unlink(temp_file_path)
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 print(f"一時ファイルの削除に失敗: {temp_file_path} - {e}")
         self.temp_files.clear()
@@ -1695,6 +2200,23 @@ class MarkdownToPdfConverter(QMainWindow):
                 return
             # discard_btnの場合はそのまま続行
         
+        self.stop_html_prefetch()
+        self.shutdown_prefetch_pool()
+        if self._html_temp_file:
+            self.remove_html_temp_file(self._html_temp_file)
+            self._html_temp_file = None
+        
+        # 一括変換中のページが読み込んでいる一時ファイルも削除
+        self.is_converting = False
+        for job in self._pdf_jobs.values():
+            if job['temp_file']:
+                self.remove_html_temp_file(job['temp_file'])
+        self._pdf_jobs.clear()
+        
+        # 実行中の読み込みワーカーの終了を待つ
+        for worker in list(self._load_workers):
+            worker.wait()
+        
         self.cleanup_temp_files()
         event.accept()
 
@@ -1714,6 +2236,8 @@ def main():
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
     # OpenGL問題を回避するための追加設定
     QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL, True)
+    # QtWebEngineをQApplication生成後に遅延インポートするために必要
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
     
     app = QApplication(sys.argv)
     app.setApplicationName("Markdown to PDF Converter")
@@ -1724,4 +2248,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # exe化した環境でプロセスプールを使用するために必要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -5,7 +5,12 @@ a = Analysis(
     ['MD2PDF.py'],
     pathex=[],
     binaries=[],
-    datas=[('img/icon.ico', 'img')],
+    datas=[
+        ('img/icon.ico', 'img'),
+        ('resources/app.qss', 'resources'),
+        ('resources/highlight.min.js', 'resources'),
+        ('resources/highlight.css', 'resources')
+    ],
     hiddenimports=[
         'PyQt5.QtWebEngineWidgets',
         'PyQt5.QtWebEngineCore', 